@@ -1,6 +1,10 @@
 from __future__ import annotations
-from typing import Any, Awaitable, Callable
-from kernel.agent_chat import AgentChatMixin
+from typing import Any, Awaitable, Callable, Coroutine
+import asyncio
+import logging
+from zoneinfo import ZoneInfo
+import httpx
+from kernel.agent_chat import AgentChatMixin, MAX_PARALLEL_TOOLS
 from kernel.agent_history import AgentHistoryMixin
 from kernel.agent_sessions import AgentSessionsMixin
 from kernel.agent_titles import AgentTitlesMixin
@@ -12,6 +16,8 @@ from kernel.models.base import LLM, Message, ToolDef
 from kernel.tools.registry import ToolRegistry
 from kernel.cli.base import CLIAgent
 
+log = logging.getLogger(__name__)
+
 class Agent(
     AgentToolsMixin, AgentSessionsMixin, AgentHistoryMixin, AgentChatMixin, AgentTitlesMixin
 ):
@@ -21,19 +27,65 @@ class Agent(
         self._current_provider_name: str = config.general.default_provider
         self._current_model: str | None = None
         self._session_id: int | None = None
-        self._history: list[Message] = []
+        self._tz = ZoneInfo(config.general.timezone)
+        self._session_has_title = False
+        self._history = self._new_history()
         self._cancelled = False
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
         self._llms: dict[str, LLM] = {}
+        self._active_llm: LLM | None = None
+        self._active_llm_name: str | None = None
+        self._available_providers_cache: list[str] | None = None
         self._titles_llm: LLM | None = None
+        self._titles_llm_lock = asyncio.Lock()
+        self._title_sem = asyncio.Semaphore(2)
+        self._title_inflight: set[int] = set()
+        self._title_cancel: dict[int, asyncio.Event] = {}
+        self._title_next_slot = 0.0
         self._registry = ToolRegistry()
         self._tools: dict[str, ToolDef] = {}
+        self._tools_cache: list[ToolDef] | None = None
         self._tool_handlers: dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._tool_sem = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+        self._write_q: asyncio.Queue[tuple[int, str, Any]] = asyncio.Queue()
+        self._writer_task: asyncio.Task | None = None
+        self._persist_task: asyncio.Task | None = None
+        self._mem_add_buf: list[tuple[str, asyncio.Future[int]]] = []
+        self._mem_flush_task: asyncio.Task | None = None
+        self._bg_tasks: set[asyncio.Task] = set()
+        # JSON forms of messages appended this turn, keyed by id(msg); lets
+        # _slim_history_inplace reuse what chat() already encoded. The value
+        # keeps the message itself so the entry pins the object alive (no
+        # id() reuse) and lookups can verify identity before trusting it.
+        self._turn_json: dict[int, tuple[Message, Any]] = {}
         self._cli_agents: dict[str, CLIAgent] = {}
         self._active_cli: CLIAgent | None = None
         self._init_cli_agents()
         self._mcp: MCPClient | None = None
         self._soul: str = ""
-        soul_path = config.config_dir / "SOUL.md"
-        if soul_path.exists():
-            self._soul = soul_path.read_text(encoding="utf-8")
+        self._soul_path = config.config_dir / "SOUL.md"
+        self._soul_mtime: float | None = None
+        k = config.general.memory_recall_k
+        self._memory_hint: str = (
+            "## 长期记忆（参数提示）\n"
+            f"memory_recall_k = {k}；需要快速浏览时可用 memory_list(limit={k})。"
+            if k > 0
+            else ""
+        )
         self._register_builtin_tools()
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_task_done)
+        return task
+
+    def _bg_task_done(self, task: asyncio.Task) -> None:
+        self._bg_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            log.warning("Background task failed", exc_info=exc)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 import asyncio
-import json
+import io
 import logging
-from typing import AsyncIterator
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable
 from kernel.agent_content import _content_to_json
+from kernel.jsonutil import json_dumps, json_loads
 from kernel.models.base import (
     ContentBlock,
     Message,
@@ -17,88 +20,188 @@ from kernel.models.base import (
 log = logging.getLogger(__name__)
 
 MAX_TOOL_ROUNDS = 25
+MAX_PARALLEL_TOOLS = 5
+MAX_WRITE_BATCH = 64
+
+_TRIVIAL_RE = re.compile(r"^(ok|okay|thx|thanks|谢谢|好的|好|嗯|收到)[\s.!~。！]*$", re.IGNORECASE)
+_FAST_ACK_TEXT = "👌"
 
 class AgentChatMixin:
-    def _build_system_prompt(self) -> str:
-        from datetime import datetime
-        from zoneinfo import ZoneInfo
+    async def start(self) -> None:
+        await self._load_soul()
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(
+                self._db_writer(), name="kernel_db_writer"
+            )
+
+    def _enqueue_message(self, session_id: int, role: str, content: Any) -> None:
+        self._write_q.put_nowait((session_id, role, self.store.slim_content(role, content)))
+
+    async def _db_writer(self) -> None:
+        while True:
+            batch = [await self._write_q.get()]
+            while len(batch) < MAX_WRITE_BATCH:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self.store.add_messages_batch(batch)
+            except Exception:
+                log.exception("Failed to persist %d message(s)", len(batch))
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+
+    async def flush_messages(self) -> None:
+        if self._writer_task is None:
+            batch: list[tuple[int, str, Any]] = []
+            while True:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if batch:
+                await self.store.add_messages_batch(batch)
+                for _ in batch:
+                    self._write_q.task_done()
+            return
+        await self._write_q.join()
 
+    async def _run_tool(
+        self, handler: Callable[..., Awaitable[Any]], tool_input: dict[str, Any]
+    ) -> Any:
+        async with self._tool_sem:
+            return await handler(**tool_input)
+
+    async def _load_soul(self) -> None:
+        try:
+            mtime = (await asyncio.to_thread(self._soul_path.stat)).st_mtime
+        except OSError:
+            self._soul = ""
+            self._soul_mtime = None
+            return
+        if mtime == self._soul_mtime:
+            return
+        self._soul = await asyncio.to_thread(self._soul_path.read_text, encoding="utf-8")
+        self._soul_mtime = mtime
+
+    def _build_system_prompt(self) -> str:
+        # Static prefix only — the per-turn time line lives in _time_block()
+        # and is passed separately so provider prompt caches keep hitting.
         parts = []
         if self._soul:
             parts.append(self._soul)
-        tz = ZoneInfo(self.config.general.timezone)
-        now = datetime.now(tz)
-        parts.append(
-            f"## 当前时间\n{now.strftime('%Y-%m-%dT%H:%M:%S%z')}（{self.config.general.timezone}）"
-        )
-        k = self.config.general.memory_recall_k
-        if k > 0:
-            parts.append(
-                "## 长期记忆（参数提示）\n"
-                f"memory_recall_k = {k}；需要快速浏览时可用 memory_list(limit={k})。"
-            )
+        if self._memory_hint:
+            parts.append(self._memory_hint)
         return "\n\n".join(parts) if parts else ""
 
+    def _time_block(self) -> str:
+        now = datetime.now(self._tz)
+        return f"## 当前时间\n{now.isoformat(timespec='seconds')}（{self.config.general.timezone}）"
+
     async def chat(self, user_content: list[ContentBlock] | str) -> AsyncIterator[StreamChunk]:
         self._cancelled = False
+        if self._turn_json:
+            # The previous turn aborted (exception or /cancel) before its
+            # end-of-turn slim ran. Slim its tail now so the stale cache
+            # entries are consumed and its full-size tool results don't
+            # linger in the in-memory context.
+            try:
+                self._slim_history_inplace()
+            except Exception:
+                log.debug("History slimming failed", exc_info=True)
         await self.ensure_session()
         assert self._session_id is not None
         user_msg = Message(role=Role.USER, content=user_content)
         self._history.append(user_msg)
-        await self.store.add_message_slimmed(
-            self._session_id, Role.USER.value, _content_to_json(user_content)
-        )
+        user_json = _content_to_json(user_content)
+        self._turn_json[id(user_msg)] = (user_msg, user_json)
+        self._enqueue_message(self._session_id, Role.USER.value, user_json)
+        if self.config.general.fast_ack:
+            text = user_msg.text_content().strip()
+            if text and _TRIVIAL_RE.match(text):
+                self._history.append(
+                    Message(role=Role.ASSISTANT, content=[TextContent(text=_FAST_ACK_TEXT)])
+                )
+                self._enqueue_message(
+                    self._session_id,
+                    Role.ASSISTANT.value,
+                    [{"type": "text", "text": _FAST_ACK_TEXT}],
+                )
+                yield StreamChunk(text=_FAST_ACK_TEXT)
+                yield StreamChunk(finish_reason="end_turn")
+                return
         llm = self._get_llm()
+        await self._load_soul()
         system = self._build_system_prompt()
-        tools_list = list(self._tools.values()) if self._tools else None
+        system_suffix = self._time_block()
+        tools_list = self._tools_cache
         for _round in range(MAX_TOOL_ROUNDS):
             self._check_cancel()
             truncated = self._truncate_history(self._history)
-            text_parts: list[str] = []
+            buf = io.StringIO()
             tool_chunks: list[StreamChunk] = []
             finish_reason: str | None = None
             async for chunk in llm.chat_stream(
-                truncated, system=system, tools=tools_list, model=self._current_model
+                truncated,
+                system=system,
+                system_suffix=system_suffix,
+                tools=tools_list,
+                model=self._current_model,
             ):
                 self._check_cancel()
                 if chunk.text:
-                    text_parts.append(chunk.text)
+                    buf.write(chunk.text)
                     yield chunk
                 if chunk.tool_use_id:
                     tool_chunks.append(chunk)
                 if chunk.finish_reason:
                     finish_reason = chunk.finish_reason
-            assistant_blocks: list[ContentBlock] = []
-            full_text = "".join(text_parts)
-            if full_text:
-                assistant_blocks.append(TextContent(text=full_text))
+            parsed_inputs: list[dict[str, Any]] = []
             for tc in tool_chunks:
                 try:
-                    tool_input = json.loads(tc.tool_input_json) if tc.tool_input_json else {}
-                except json.JSONDecodeError:
-                    tool_input = {}
-                assistant_blocks.append(
-                    ToolUseContent(
-                        id=tc.tool_use_id or "",
-                        name=tc.tool_name or "",
-                        input=tool_input,
+                    parsed_inputs.append(
+                        json_loads(tc.tool_input_json) if tc.tool_input_json else {}
                     )
+                except ValueError:
+                    parsed_inputs.append({})
+            full_text = buf.getvalue()
+            offset = 1 if full_text else 0
+            n_blocks = offset + len(tool_chunks)
+            assistant_blocks: list[ContentBlock] = [None] * n_blocks  # type: ignore[list-item]
+            assistant_json: list[dict[str, Any]] = [None] * n_blocks  # type: ignore[list-item]
+            if full_text:
+                assistant_blocks[0] = TextContent(text=full_text)
+                assistant_json[0] = {"type": "text", "text": full_text}
+            for i, (tc, tool_input) in enumerate(zip(tool_chunks, parsed_inputs), start=offset):
+                assistant_blocks[i] = ToolUseContent(
+                    id=tc.tool_use_id or "",
+                    name=tc.tool_name or "",
+                    input=tool_input,
                 )
+                assistant_json[i] = {
+                    "type": "tool_use",
+                    "id": tc.tool_use_id or "",
+                    "name": tc.tool_name or "",
+                    "input": tool_input,
+                }
             assistant_msg = Message(role=Role.ASSISTANT, content=assistant_blocks)
             self._history.append(assistant_msg)
-            await self.store.add_message_slimmed(
-                self._session_id, Role.ASSISTANT.value, _content_to_json(assistant_blocks)
-            )
+            self._turn_json[id(assistant_msg)] = (assistant_msg, assistant_json)
+            self._enqueue_message(self._session_id, Role.ASSISTANT.value, assistant_json)
             if not tool_chunks:
                 yield StreamChunk(finish_reason=finish_reason or "end_turn")
                 break
-            result_blocks: list[ContentBlock] = []
-            for tc in tool_chunks:
+            slots: list[ToolResultContent | None] = []
+            coros: list[Awaitable[Any]] = []
+            coro_meta: list[tuple[int, str, str]] = []
+            for tc, tool_input in zip(tool_chunks, parsed_inputs):
                 tool_name = tc.tool_name or ""
                 tool_id = tc.tool_use_id or ""
                 handler = self._tool_handlers.get(tool_name)
                 if handler is None:
-                    result_blocks.append(
+                    slots.append(
                         ToolResultContent(
                             tool_use_id=tool_id,
                             content=f"Error: unknown tool '{tool_name}'",
@@ -106,44 +209,38 @@ class AgentChatMixin:
                         )
                     )
                     continue
-                try:
-                    tool_input = json.loads(tc.tool_input_json) if tc.tool_input_json else {}
-                except json.JSONDecodeError:
-                    tool_input = {}
                 yield StreamChunk(text="", tool_use_id=tool_id, tool_name=tool_name)
-                try:
-                    result = await handler(**tool_input)
-                    result_str = (
-                        json.dumps(result, ensure_ascii=False)
-                        if not isinstance(result, str)
-                        else result
-                    )
-                except asyncio.CancelledError:
-                    result_blocks.append(
-                        ToolResultContent(
-                            tool_use_id=tool_id,
-                            content="Task cancelled by user",
-                            is_error=True,
-                        )
-                    )
-                    raise
-                except Exception as exc:
-                    log.exception("Tool %s failed", tool_name)
-                    result_str = f"Error: {exc}"
-                    result_blocks.append(
-                        ToolResultContent(
-                            tool_use_id=tool_id, content=result_str, is_error=True
-                        )
+                coro_meta.append((len(slots), tool_id, tool_name))
+                slots.append(None)
+                coros.append(self._run_tool(handler, tool_input))
+            results = await asyncio.gather(*coros, return_exceptions=True)
+            for (slot, tool_id, tool_name), result in zip(coro_meta, results):
+                if isinstance(result, asyncio.CancelledError):
+                    raise result
+                if isinstance(result, BaseException):
+                    log.error("Tool %s failed", tool_name, exc_info=result)
+                    slots[slot] = ToolResultContent(
+                        tool_use_id=tool_id, content=f"Error: {result}", is_error=True
                     )
                     continue
-                result_blocks.append(
-                    ToolResultContent(tool_use_id=tool_id, content=result_str)
+                result_str = (
+                    json_dumps(result) if not isinstance(result, str) else result
                 )
+                slots[slot] = ToolResultContent(tool_use_id=tool_id, content=result_str)
+            result_blocks: list[ContentBlock] = [b for b in slots if b is not None]
+            result_json = [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": b.tool_use_id,
+                    "content": b.content,
+                    "is_error": b.is_error,
+                }
+                for b in result_blocks
+            ]
             tool_result_msg = Message(role=Role.TOOL_RESULT, content=result_blocks)
             self._history.append(tool_result_msg)
-            await self.store.add_message_slimmed(
-                self._session_id, Role.TOOL_RESULT.value, _content_to_json(result_blocks)
-            )
+            self._turn_json[id(tool_result_msg)] = (tool_result_msg, result_json)
+            self._enqueue_message(self._session_id, Role.TOOL_RESULT.value, result_json)
         else:
             msg_text = (
                 f"已达到最大工具调用轮数({MAX_TOOL_ROUNDS})，为避免无限循环已停止。\n"
@@ -152,10 +249,8 @@ class AgentChatMixin:
             assistant_blocks: list[ContentBlock] = [TextContent(text=msg_text)]
             assistant_msg = Message(role=Role.ASSISTANT, content=assistant_blocks)
             self._history.append(assistant_msg)
-            await self.store.add_message_slimmed(
-                self._session_id,
-                Role.ASSISTANT.value,
-                _content_to_json(assistant_blocks),
+            self._enqueue_message(
+                self._session_id, Role.ASSISTANT.value, [{"type": "text", "text": msg_text}]
             )
             yield StreamChunk(text=msg_text)
             yield StreamChunk(finish_reason="max_tool_rounds")
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable
 from kernel.models.base import (
     ContentBlock,
     ImageContent,
@@ -10,26 +10,41 @@ from kernel.models.base import (
     ToolUseContent,
 )
 
+_ENCODE: dict[type, Callable[[Any], dict[str, Any]]] = {
+    TextContent: lambda b: {"type": "text", "text": b.text},
+    ImageContent: lambda b: {"type": "image", "media_type": b.media_type, "data": b.data},
+    ToolUseContent: lambda b: {"type": "tool_use", "id": b.id, "name": b.name, "input": b.input},
+    ToolResultContent: lambda b: {
+        "type": "tool_result",
+        "tool_use_id": b.tool_use_id,
+        "content": b.content,
+        "is_error": b.is_error,
+    },
+}
+
+_DECODE: dict[str, Callable[[dict[str, Any]], ContentBlock]] = {
+    "text": lambda d: TextContent(text=d["text"]),
+    "image": lambda d: ImageContent(media_type=d["media_type"], data=d["data"]),
+    "tool_use": lambda d: ToolUseContent(id=d["id"], name=d["name"], input=d["input"]),
+    "tool_result": lambda d: ToolResultContent(
+        tool_use_id=d["tool_use_id"],
+        content=d["content"],
+        is_error=d.get("is_error", False),
+    ),
+}
+
 def _content_to_json(content: list[ContentBlock] | str) -> Any:
     if isinstance(content, str):
         return content
-    out: list[dict[str, Any]] = []
+    out: list[dict[str, Any]] = [None] * len(content)  # type: ignore[list-item]
+    i = 0
     for b in content:
-        if isinstance(b, TextContent):
-            out.append({"type": "text", "text": b.text})
-        elif isinstance(b, ImageContent):
-            out.append({"type": "image", "media_type": b.media_type, "data": b.data})
-        elif isinstance(b, ToolUseContent):
-            out.append({"type": "tool_use", "id": b.id, "name": b.name, "input": b.input})
-        elif isinstance(b, ToolResultContent):
-            out.append(
-                {
-                    "type": "tool_result",
-                    "tool_use_id": b.tool_use_id,
-                    "content": b.content,
-                    "is_error": b.is_error,
-                }
-            )
+        encode = _ENCODE.get(type(b))
+        if encode is not None:
+            out[i] = encode(b)
+            i += 1
+    if i != len(out):
+        del out[i:]
     return out
 
 def _json_to_content(data: Any) -> list[ContentBlock] | str:
@@ -37,21 +52,9 @@ def _json_to_content(data: Any) -> list[ContentBlock] | str:
         return data
     blocks: list[ContentBlock] = []
     for d in data:
-        t = d.get("type")
-        if t == "text":
-            blocks.append(TextContent(text=d["text"]))
-        elif t == "image":
-            blocks.append(ImageContent(media_type=d["media_type"], data=d["data"]))
-        elif t == "tool_use":
-            blocks.append(ToolUseContent(id=d["id"], name=d["name"], input=d["input"]))
-        elif t == "tool_result":
-            blocks.append(
-                ToolResultContent(
-                    tool_use_id=d["tool_use_id"],
-                    content=d["content"],
-                    is_error=d.get("is_error", False),
-                )
-            )
+        decode = _DECODE.get(d.get("type"))
+        if decode is not None:
+            blocks.append(decode(d))
     return blocks
 
 def _json_to_message(row: dict[str, Any]) -> Message:
@@ -1,4 +1,6 @@
 from __future__ import annotations
+from collections import deque
+from typing import Iterable
 from kernel.agent_content import _content_to_json, _json_to_content
 from kernel.memory.store import Store
 from kernel.models.base import (
@@ -10,6 +12,13 @@ from kernel.models.base import (
 )
 
 class AgentHistoryMixin:
+    def _history_maxlen(self) -> int | None:
+        rounds = self.config.general.context_rounds
+        return rounds * 2 if rounds > 0 else None
+
+    def _new_history(self, messages: Iterable[Message] = ()) -> deque[Message]:
+        return deque(messages, maxlen=self._history_maxlen())
+
     def _tool_safe_history(self, messages: list[Message]) -> list[Message]:
         if not messages:
             return messages
@@ -20,60 +29,87 @@ class AgentHistoryMixin:
             for block in msg.content:
                 if isinstance(block, ToolResultContent) and block.tool_use_id:
                     tool_result_ids.add(block.tool_use_id)
-        cleaned: list[Message] = []
+        # Tool results always follow their assistant message, so one pass can
+        # collect kept tool_use ids and filter results as it goes. Messages
+        # are only rebuilt when a block was actually removed.
+        final: list[Message] = []
         tool_use_ids: set[str] = set()
         for msg in messages:
             if msg.role == Role.ASSISTANT and isinstance(msg.content, list):
-                new_blocks: list[ContentBlock] = []
+                dropped = False
                 for block in msg.content:
                     if isinstance(block, ToolUseContent):
                         if block.id and block.id in tool_result_ids:
-                            new_blocks.append(block)
                             tool_use_ids.add(block.id)
-                        continue
-                    new_blocks.append(block)
+                        else:
+                            dropped = True
+                if not dropped:
+                    final.append(msg)
+                    continue
+                new_blocks: list[ContentBlock] = [
+                    b
+                    for b in msg.content
+                    if not isinstance(b, ToolUseContent)
+                    or (b.id and b.id in tool_result_ids)
+                ]
                 if new_blocks:
-                    cleaned.append(Message(role=msg.role, content=new_blocks))
+                    final.append(Message(role=msg.role, content=new_blocks))
                 continue
-            cleaned.append(msg)
-
-        final: list[Message] = []
-        for msg in cleaned:
-            if msg.role != Role.TOOL_RESULT or not isinstance(msg.content, list):
-                final.append(msg)
+            if msg.role == Role.TOOL_RESULT and isinstance(msg.content, list):
+                if all(
+                    isinstance(b, ToolResultContent) and b.tool_use_id in tool_use_ids
+                    for b in msg.content
+                ):
+                    final.append(msg)
+                    continue
+                new_blocks = [
+                    b
+                    for b in msg.content
+                    if isinstance(b, ToolResultContent) and b.tool_use_id in tool_use_ids
+                ]
+                if new_blocks:
+                    final.append(Message(role=msg.role, content=new_blocks))
                 continue
-            new_blocks = [
-                b
-                for b in msg.content
-                if isinstance(b, ToolResultContent) and b.tool_use_id in tool_use_ids
-            ]
-            if new_blocks:
-                final.append(Message(role=msg.role, content=new_blocks))
+            final.append(msg)
         return final
 
-    def _truncate_history(self, messages: list[Message]) -> list[Message]:
+    def _truncate_history(self, messages: deque[Message]) -> list[Message]:
         rounds = self.config.general.context_rounds
+        msgs = list(messages)
         if rounds <= 0:
             start = 0
-            for i in range(len(messages) - 1, -1, -1):
-                if messages[i].role == Role.USER:
+            for i in range(len(msgs) - 1, -1, -1):
+                if msgs[i].role == Role.USER:
                     start = i
                     break
-            return self._tool_safe_history(messages[start:])
+            return self._tool_safe_history(msgs[start:])
         max_msgs = rounds * 2
-        if len(messages) <= max_msgs:
-            return self._tool_safe_history(messages)
-        truncated = messages[-max_msgs:]
-        for i, msg in enumerate(truncated):
+        if len(msgs) < max_msgs:
+            return self._tool_safe_history(msgs)
+        for i, msg in enumerate(msgs):
             if msg.role == Role.USER:
-                return self._tool_safe_history(truncated[i:])
-        return self._tool_safe_history(truncated)
+                return self._tool_safe_history(msgs[i:])
+        return self._tool_safe_history(msgs)
 
     def _slim_history_inplace(self) -> None:
-        slimmed: list[Message] = []
-        for msg in self._history:
-            raw = _content_to_json(msg.content)
+        # Everything before the last user message was slimmed either at the
+        # end of its own turn or by the catch-up slim chat() runs after an
+        # aborted turn, so only the tail from that message onward needs work.
+        start = 0
+        for i, msg in enumerate(self._history):
+            if msg.role == Role.USER:
+                start = i
+        for i in range(start, len(self._history)):
+            msg = self._history[i]
+            if isinstance(msg.content, str):
+                continue
+            entry = self._turn_json.get(id(msg))
+            if entry is not None and entry[0] is msg:
+                raw = entry[1]
+            else:
+                raw = _content_to_json(msg.content)
             slimmed_json = Store.slim_content(msg.role.value, raw)
-            slimmed_content = _json_to_content(slimmed_json)
-            slimmed.append(Message(role=msg.role, content=slimmed_content))
-        self._history = slimmed
+            self._history[i] = Message(
+                role=msg.role, content=_json_to_content(slimmed_json)
+            )
+        self._turn_json.clear()
@@ -1,29 +1,35 @@
 from __future__ import annotations
 import asyncio
 import logging
+import httpx
 from kernel.agent_content import _json_to_message
 from kernel.config import ProviderConfig
 from kernel.models.base import LLM
-from kernel.models.claude import ClaudeLLM
-from kernel.models.openai_compat import OpenAICompatLLM
 
 log = logging.getLogger(__name__)
 
-def _make_llm(provider: ProviderConfig) -> LLM:
+def _make_llm(provider: ProviderConfig, http_client: httpx.AsyncClient | None = None) -> LLM:
+    # Imported lazily so startup only pays for the SDK actually in use.
     if provider.type == "claude":
+        from kernel.models.claude import ClaudeLLM
+
         return ClaudeLLM(
             api_key=provider.api_key,
             default_model=provider.default_model,
             max_tokens=provider.max_tokens or 4096,
             api_base=provider.api_base,
             headers=provider.headers,
+            http_client=http_client,
         )
+    from kernel.models.openai_compat import OpenAICompatLLM
+
     return OpenAICompatLLM(
         api_key=provider.api_key,
         default_model=provider.default_model,
         api_base=provider.api_base,
         max_tokens=provider.max_tokens,
         headers=provider.headers,
+        http_client=http_client,
     )
 
 class AgentSessionsMixin:
@@ -38,11 +44,14 @@ class AgentSessionsMixin:
 
     @property
     def available_providers(self) -> list[str]:
-        return [
-            name
-            for name, p in self.config.providers.items()
-            if p.api_key and (not p.api_key.endswith("..."))
-        ]
+        # Config is loaded once at startup, so the scan result never changes.
+        if self._available_providers_cache is None:
+            self._available_providers_cache = [
+                name
+                for name, p in self.config.providers.items()
+                if p.api_key and (not p.api_key.endswith("..."))
+            ]
+        return self._available_providers_cache
 
     def switch_provider(self, name: str) -> str:
         if name not in self.config.providers:
@@ -52,7 +61,8 @@ class AgentSessionsMixin:
             raise ValueError(f"Provider '{name}' has no API key configured.")
         self._current_provider_name = name
         self._current_model = None
-        asyncio.create_task(self._persist_provider_model())
+        self._active_llm = None
+        self._schedule_persist()
         return name
 
     def switch_model(self, model: str) -> str:
@@ -63,16 +73,30 @@ class AgentSessionsMixin:
                 f"Model '{model}' not in allowed models for {self._current_provider_name}: [{allowed}]"
             )
         self._current_model = model
-        asyncio.create_task(self._persist_provider_model())
+        self._schedule_persist()
         return model
 
+    def _schedule_persist(self) -> None:
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = self._spawn(self._persist_provider_model())
+
     async def _persist_provider_model(self) -> None:
-        try:
-            await self.store.set_setting("last_provider", self._current_provider_name)
+        # Brief delay coalesces rapid consecutive switches into one write.
+        await asyncio.sleep(0.1)
+        while True:
+            provider = self._current_provider_name
             model = self._current_model or ""
-            await self.store.set_setting("last_model", model)
-        except Exception:
-            log.debug("Failed to persist provider/model", exc_info=True)
+            try:
+                await self.store.set_setting("last_provider", provider)
+                await self.store.set_setting("last_model", model)
+            except Exception:
+                log.debug("Failed to persist provider/model", exc_info=True)
+                return
+            if (
+                provider == self._current_provider_name
+                and model == (self._current_model or "")
+            ):
+                return
 
     async def restore_provider_model(self) -> None:
         try:
@@ -96,10 +120,15 @@ class AgentSessionsMixin:
 
     def _get_llm(self) -> LLM:
         name = self._current_provider_name
-        if name not in self._llms:
+        if self._active_llm is not None and self._active_llm_name == name:
+            return self._active_llm
+        llm = self._llms.get(name)
+        if llm is None:
             prov = self.config.providers[name]
-            self._llms[name] = _make_llm(prov)
-        return self._llms[name]
+            llm = self._llms[name] = _make_llm(prov, self._http)
+        self._active_llm = llm
+        self._active_llm_name = name
+        return llm
 
     @property
     def session_id(self) -> int | None:
@@ -107,9 +136,12 @@ class AgentSessionsMixin:
 
     async def new_session(self) -> int:
         if self._session_id is not None:
+            self._cancel_title_retries(self._session_id)
             await self.store.archive_session(self._session_id)
         self._session_id = await self.store.create_session()
-        self._history = []
+        self._session_has_title = False
+        self._history = self._new_history()
+        self._turn_json.clear()
         return self._session_id
 
     async def resume_session(self, session_id: int) -> int:
@@ -117,14 +149,20 @@ class AgentSessionsMixin:
         if session is None:
             raise ValueError(f"Session {session_id} not found.")
         if self._session_id is not None and self._session_id != session_id:
+            self._cancel_title_retries(self._session_id)
             await self.store.archive_session(self._session_id)
         self._session_id = session_id
+        self._session_has_title = bool(session.get("title"))
+        await self.flush_messages()
         rows = await self.store.get_messages(session_id)
-        self._history = [_json_to_message(r) for r in rows]
+        self._history = self._new_history(_json_to_message(r) for r in rows)
+        self._turn_json.clear()
         return session_id
 
     async def ensure_session(self) -> int:
         if self._session_id is None:
             self._session_id = await self.store.create_session()
-            self._history = []
+            self._session_has_title = False
+            self._history = self._new_history()
+            self._turn_json.clear()
         return self._session_id
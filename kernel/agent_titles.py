@@ -1,112 +1,207 @@
 from __future__ import annotations
 import asyncio
+import functools
+import hashlib
 import logging
-import re
+import random
+import httpx
 from kernel.config import TitlesConfig
 from kernel.models.base import LLM, Message, Role
-from kernel.models.claude import ClaudeLLM
-from kernel.models.openai_compat import OpenAICompatLLM
 
 log = logging.getLogger(__name__)
 
-TITLE_RETRY_DELAYS = [0, 3, 15, 60]
+TITLE_MAX_TRIES = 5
+TITLE_BASE_DELAY = 2.0
+TITLE_MAX_DELAY = 60.0
+TITLE_MIN_INTERVAL = 1.0
 TITLE_MAX_LEN = 30
 
-_THINK_RE = re.compile("<think>.*?</think>", re.DOTALL)
-_THINK_OPEN_RE = re.compile("<think>.*", re.DOTALL)
+_TITLE_STRIP = " \t\n\r\"'"
+
+def _strip_think(s: str) -> str:
+    # Plain find() scan: linear time, no regex engine. An unterminated
+    # <think> drops everything after it, matching the old pattern.
+    out: list[str] = []
+    i = 0
+    while True:
+        j = s.find("<think>", i)
+        if j < 0:
+            out.append(s[i:])
+            break
+        out.append(s[i:j])
+        k = s.find("</think>", j + 7)
+        if k < 0:
+            break
+        i = k + 8
+    return "".join(out)
 
 def _is_rate_limited(exc: Exception) -> bool:
-    for attr in ("status_code", "status"):
-        try:
-            code = getattr(exc, attr)
-        except Exception:
-            code = None
-        if code == 429:
-            return True
+    if getattr(exc, "status_code", None) == 429 or getattr(exc, "status", None) == 429:
+        return True
     resp = getattr(exc, "response", None)
     if getattr(resp, "status_code", None) == 429:
         return True
-    exc_str = str(exc).lower()
-    return (
-        ("429" in exc_str)
-        or ("rate limit" in exc_str)
-        or ("too many requests" in exc_str)
-    )
+    s = str(exc)
+    if "429" in s:
+        return True
+    sl = s.lower()
+    return "rate limit" in sl or "too many requests" in sl
 
 def _clean_title(raw: str) -> str:
-    text = _THINK_RE.sub("", raw)
-    text = _THINK_OPEN_RE.sub("", text)
-    text = text.strip().strip("\"'")
-    for line in text.split("\n"):
-        line = line.strip()
-        if line:
-            return line[:TITLE_MAX_LEN]
-    return ""
-
-def _make_titles_llm(cfg: TitlesConfig) -> LLM:
+    text = _strip_think(raw) if "<think>" in raw else raw
+    text = text.strip(_TITLE_STRIP)
+    # After the strip the text cannot start with a newline, so the first
+    # line is the first non-empty one; partition avoids building a list.
+    return text.partition("\n")[0].rstrip()[:TITLE_MAX_LEN]
+
+def _make_titles_llm(cfg: TitlesConfig, http_client: httpx.AsyncClient | None = None) -> LLM:
+    # Imported lazily so startup only pays for the SDK actually in use.
     if cfg.type == "claude":
+        from kernel.models.claude import ClaudeLLM
+
         return ClaudeLLM(
             api_key=cfg.api_key,
             default_model=cfg.model,
             max_tokens=cfg.max_tokens,
             api_base=cfg.api_base,
             headers=cfg.headers,
+            http_client=http_client,
         )
+    from kernel.models.openai_compat import OpenAICompatLLM
+
     return OpenAICompatLLM(
         api_key=cfg.api_key,
         default_model=cfg.model,
         api_base=cfg.api_base,
         max_tokens=cfg.max_tokens,
         headers=cfg.headers,
+        http_client=http_client,
     )
 
+def _title_cache_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+_TITLE_PROMPT_PREFIX = "根据以下对话生成一个简短的标题（10字以内，不要引号）：\n\n"
+
+def _flatten_content(content: object) -> str | None:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            [b["text"] for b in content if isinstance(b, dict) and b.get("type") == "text"]
+        )
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _title_prompt_from_key(key: tuple[tuple[str, str], ...]) -> str:
+    return _TITLE_PROMPT_PREFIX + "\n".join([f"{role}: {text}" for role, text in key])
+
 def _build_title_prompt(rows: list[dict]) -> str:
-    parts: list[str] = []
+    # Repeated regens over unchanged rows hit the LRU instead of
+    # reassembling the same prompt string.
+    key = []
     for r in rows:
-        content = r["content"]
-        if isinstance(content, str):
-            text = content
-        elif isinstance(content, list):
-            text = " ".join(
-                b["text"] for b in content if isinstance(b, dict) and b.get("type") == "text"
-            )
-        else:
-            continue
-        parts.append(f"{r['role']}: {text}")
-    return "根据以下对话生成一个简短的标题（10字以内，不要引号）：\n\n" + "\n".join(parts)
+        text = _flatten_content(r["content"])
+        if text is not None:
+            key.append((r["role"], text))
+    return _title_prompt_from_key(tuple(key))
 
 class AgentTitlesMixin:
     async def maybe_generate_title(self) -> None:
-        if self._session_id is None:
+        if self._session_id is None or self._session_has_title:
+            return
+        if self._session_id in self._title_inflight:
             return
         session = await self.store.get_session(self._session_id)
         if session and (not session.get("title")):
-            asyncio.create_task(self._generate_title(self._session_id))
+            self._spawn(self._generate_title(self._session_id))
 
-    def _ensure_titles_llm(self) -> bool:
+    async def _ensure_titles_llm(self) -> bool:
         if not self.config.titles:
             return False
-        if self._titles_llm is None:
-            self._titles_llm = _make_titles_llm(self.config.titles)
+        if self._titles_llm is not None:
+            return True
+        async with self._titles_llm_lock:
+            if self._titles_llm is None:
+                self._titles_llm = _make_titles_llm(self.config.titles, self._http)
         return True
 
     async def _generate_title(self, session_id: int) -> None:
-        if not self._ensure_titles_llm():
+        if not await self._ensure_titles_llm():
+            return
+        if session_id in self._title_inflight:
+            return
+        self._title_inflight.add(session_id)
+        cancel = self._title_cancel.setdefault(session_id, asyncio.Event())
+        try:
+            async with self._title_sem:
+                await self._generate_title_locked(session_id, cancel)
+        finally:
+            self._title_inflight.discard(session_id)
+            self._title_cancel.pop(session_id, None)
+
+    async def _title_rate_gate(self) -> None:
+        # Reserve the next send slot so title calls are paced at most one
+        # per TITLE_MIN_INTERVAL, staying under the provider's rate cap
+        # instead of burning attempts on 429s.
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._title_next_slot)
+        self._title_next_slot = slot + TITLE_MIN_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _cancel_title_retries(self, session_id: int | None) -> None:
+        if session_id is None:
             return
+        ev = self._title_cancel.get(session_id)
+        if ev is not None:
+            ev.set()
+
+    async def _generate_title_locked(
+        self, session_id: int, cancel: asyncio.Event
+    ) -> None:
+        await self.flush_messages()
         rows = await self.store.get_messages(session_id, limit=4)
         if not rows:
             return
         prompt = _build_title_prompt(rows)
-        for attempt, delay in enumerate(TITLE_RETRY_DELAYS):
-            if delay:
-                await asyncio.sleep(delay)
-            try:
-                resp = await self._titles_llm.chat(
-                    [Message(role=Role.USER, content=prompt)]
+        cache_key = _title_cache_key(prompt)
+        cached = await self.store.title_cache_get(cache_key)
+        if cached:
+            await self.store.update_session_title(session_id, cached)
+            if session_id == self._session_id:
+                self._session_has_title = True
+            log.info("Session %d titled from cache: %s", session_id, cached)
+            return
+        msgs = [Message(role=Role.USER, content=prompt)]
+        for attempt in range(TITLE_MAX_TRIES):
+            if attempt:
+                # Exponential backoff with jitter so concurrent title tasks
+                # don't retry in lockstep against the same rate limit.
+                delay = min(
+                    TITLE_MAX_DELAY,
+                    random.uniform(TITLE_BASE_DELAY, TITLE_BASE_DELAY * 2) * attempt,
                 )
+                try:
+                    await asyncio.wait_for(cancel.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            if cancel.is_set():
+                log.info(
+                    "Title generation for session %d abandoned — session left",
+                    session_id,
+                )
+                return
+            try:
+                await self._title_rate_gate()
+                resp = await self._titles_llm.chat(msgs)
                 title = _clean_title(resp.text_content())
                 if title:
                     await self.store.update_session_title(session_id, title)
+                    await self.store.title_cache_set(cache_key, title)
+                    if session_id == self._session_id:
+                        self._session_has_title = True
                     log.info("Session %d titled: %s", session_id, title)
                 return
             except Exception as exc:
@@ -114,13 +209,13 @@ class AgentTitlesMixin:
                     log.warning(
                         "Title generation hit rate limit (attempt %d/%d), retrying",
                         attempt + 1,
-                        len(TITLE_RETRY_DELAYS),
+                        TITLE_MAX_TRIES,
                     )
                     continue
                 log.warning(
                     "Title generation attempt %d/%d failed",
                     attempt + 1,
-                    len(TITLE_RETRY_DELAYS),
+                    TITLE_MAX_TRIES,
                     exc_info=True,
                 )
         log.warning(
@@ -128,14 +223,26 @@ class AgentTitlesMixin:
         )
 
     async def regenerate_title(self, session_id: int) -> str | None:
-        if not self._ensure_titles_llm():
+        if not await self._ensure_titles_llm():
             return None
+        await self.flush_messages()
         rows = await self.store.get_messages(session_id, limit=6)
         if not rows:
             return None
         prompt = _build_title_prompt(rows)
+        cache_key = _title_cache_key(prompt)
+        cached = await self.store.title_cache_get(cache_key)
+        if cached:
+            await self.store.update_session_title(session_id, cached)
+            if session_id == self._session_id:
+                self._session_has_title = True
+            return cached
+        await self._title_rate_gate()
         resp = await self._titles_llm.chat([Message(role=Role.USER, content=prompt)])
         title = _clean_title(resp.text_content())
         if title:
             await self.store.update_session_title(session_id, title)
+            await self.store.title_cache_set(cache_key, title)
+            if session_id == self._session_id:
+                self._session_has_title = True
         return title or None
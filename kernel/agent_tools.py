@@ -2,8 +2,8 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
-import uuid
-from datetime import datetime, timezone
+import secrets
+import time
 from typing import Any
 from kernel.cli.claude_code import ClaudeCodeAgent
 from kernel.cli.codex import CodexAgent
@@ -11,6 +11,17 @@ from kernel.mcp.client import MCPClient
 
 log = logging.getLogger(__name__)
 
+_CLI_SAFE_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+def _utc_stamp() -> str:
+    # Fixed, locale-independent format; f-string assembly skips the
+    # strftime locale machinery and the tz-aware datetime construction.
+    t = time.gmtime()
+    return (
+        f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}"
+        f"_{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}"
+    )
+
 class AgentToolsMixin:
     def _init_cli_agents(self) -> None:
         output_dir = self.config.data_path / "cli_outputs"
@@ -42,7 +53,7 @@ class AgentToolsMixin:
             description="将一条信息存入长期记忆。只记有长期价值的信息（偏好、约定、重要事实）。",
         )
         async def memory_add(text: str) -> dict[str, Any]:
-            mid = await self.store.memory_add(text)
+            mid = await self._memory_add_buffered(text)
             return {"id": mid}
 
         @self._registry.tool(
@@ -62,6 +73,35 @@ class AgentToolsMixin:
 
         self._tools.update(self._registry.tool_defs())
         self._tool_handlers.update(self._registry.handlers())
+        self._tools_cache = list(self._tools.values()) if self._tools else None
+
+    async def _memory_add_buffered(self, text: str) -> int:
+        fut: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        self._mem_add_buf.append((text, fut))
+        if self._mem_flush_task is None or self._mem_flush_task.done():
+            self._mem_flush_task = self._spawn(self.flush_mem_adds())
+        return await fut
+
+    async def flush_mem_adds(self) -> None:
+        # Yield once so sibling memory_add calls dispatched in the same tool
+        # round land in the buffer before we write.
+        await asyncio.sleep(0)
+        # Loop until the buffer stays empty: an add that arrives while the
+        # write below is in flight sees this task as still running and
+        # spawns nothing, so exiting without re-checking would strand it
+        # (and leave its future unresolved forever).
+        while self._mem_add_buf:
+            buf, self._mem_add_buf = self._mem_add_buf, []
+            try:
+                ids = await self.store.memory_add_many([text for text, _ in buf])
+            except Exception as exc:
+                for _, fut in buf:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, fut), mid in zip(buf, ids):
+                if not fut.done():
+                    fut.set_result(mid)
 
     async def init_mcp(self) -> None:
         if not self.config.mcp_servers:
@@ -75,13 +115,21 @@ class AgentToolsMixin:
             return
         mcp_defs = self._mcp.get_tool_defs()
         mcp_client = self._mcp
-        for name, tool_def in mcp_defs.items():
 
-            async def _mcp_handler(_name: str = name, **kwargs: Any) -> str:
-                return await mcp_client.call_tool(_name, kwargs)
-
-            self._tools[name] = tool_def
-            self._tool_handlers[name] = _mcp_handler
+        def _make_handler(tool_name: str) -> Any:
+            # Bake the tool name in as a constant so dispatch avoids a
+            # closure-cell load and CPython 3.11+ can specialize the call.
+            src = (
+                "async def _mcp_handler(**kwargs):\n"
+                f"    return await _client.call_tool({tool_name!r}, kwargs)\n"
+            )
+            ns: dict[str, Any] = {"_client": mcp_client}
+            exec(src, ns)
+            return ns["_mcp_handler"]
+
+        self._tools.update(mcp_defs)
+        self._tool_handlers.update({name: _make_handler(name) for name in mcp_defs})
+        self._tools_cache = list(self._tools.values()) if self._tools else None
         if mcp_defs:
             log.info("Registered %d MCP tools", len(mcp_defs))
 
@@ -102,13 +150,13 @@ class AgentToolsMixin:
             tasks_dir = self.config.default_workspace_path
             if tasks_dir.name.lower() != "tasks":
                 tasks_dir = tasks_dir / "tasks"
-            tasks_dir.mkdir(parents=True, exist_ok=True)
-            ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            ts = _utc_stamp()
             sid = self._session_id or 0
-            safe_cli = re.sub("[^A-Za-z0-9_-]", "_", cli_name)
-            uid = uuid.uuid4().hex[:6]
+            safe_cli = _CLI_SAFE_RE.sub("_", cli_name)
+            uid = secrets.token_hex(3)
             run_dir = tasks_dir / f"s{sid}_{safe_cli}_{ts}_{uid}"
-            run_dir.mkdir(parents=True, exist_ok=True)
+            # mkdir can touch slow storage; keep it off the event loop.
+            await asyncio.to_thread(run_dir.mkdir, parents=True, exist_ok=True)
             work_dir = str(run_dir)
         self._active_cli = agent
         try:
@@ -120,7 +168,7 @@ class AgentToolsMixin:
     def cancel(self) -> None:
         self._cancelled = True
         if self._active_cli and self._active_cli.is_running:
-            asyncio.create_task(self._active_cli.kill())
+            self._spawn(self._active_cli.kill())
 
     def _check_cancel(self) -> None:
         if self._cancelled:
@@ -134,15 +182,36 @@ class AgentToolsMixin:
         return None
 
     async def close(self) -> None:
-        for llm in self._llms.values():
-            await llm.close()
-        self._llms.clear()
+        # Drain the queue before cancelling the writer: cancelling first
+        # would drop a batch the writer had already dequeued mid-write.
+        try:
+            await self.flush_messages()
+        except Exception:
+            log.warning("Failed to flush pending messages on close", exc_info=True)
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        # LLM clients, MCP connections and CLI processes shut down
+        # independently; fan out so close waits for the slowest, not the sum.
+        coros = [llm.close() for llm in self._llms.values()]
         if self._titles_llm:
-            await self._titles_llm.close()
-            self._titles_llm = None
+            coros.append(self._titles_llm.close())
         if self._mcp:
-            await self._mcp.close()
-            self._mcp = None
-        for cli in self._cli_agents.values():
-            if cli.is_running:
-                await cli.kill()
+            coros.append(self._mcp.close())
+        coros.extend(
+            cli.kill() for cli in self._cli_agents.values() if cli.is_running
+        )
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        for res in results:
+            if isinstance(res, BaseException):
+                log.warning("Error during agent shutdown", exc_info=res)
+        self._llms.clear()
+        self._active_llm = None
+        self._active_llm_name = None
+        self._titles_llm = None
+        self._mcp = None
+        await self._http.aclose()
@@ -12,7 +12,7 @@ from kernel.tg_commands_memory import cmd_forget, cmd_memory, cmd_remember
 from kernel.tg_commands_sessions import cmd_del_history, cmd_help, cmd_history, cmd_new, cmd_resume, cmd_retitle, cmd_start
 from kernel.tg_commands_settings import cmd_cancel, cmd_model, cmd_provider, cmd_status
 from kernel.tg_common import BotState
-from kernel.tg_message import handle_message
+from kernel.tg_message import handle_message, typing_loop
 from kernel.voice.stt import STTClient
 from kernel.voice.tts import TTSClient
 
@@ -46,9 +46,9 @@ async def run_bot() -> None:
     await store.init()
 
     agent = Agent(config, store)
-    await agent.restore_provider_model()
+    # These startup steps are independent; overlap their I/O waits.
+    await asyncio.gather(agent.start(), agent.restore_provider_model(), agent.init_mcp())
     log.info('Provider: %s | Model: %s', agent.current_provider_name, agent.current_model)
-    await agent.init_mcp()
 
     (config.data_path / 'cli_outputs').mkdir(parents=True, exist_ok=True)
     (config.data_path / 'downloads').mkdir(parents=True, exist_ok=True)
@@ -94,8 +94,10 @@ async def run_bot() -> None:
     app.add_handler(CommandHandler('forget', cmd_forget))
     app.add_handler(MessageHandler(filters.ChatType.PRIVATE & (filters.TEXT | filters.PHOTO | filters.Document.ALL | filters.VOICE) & ~filters.COMMAND, handle_message))
 
+    typing_task: asyncio.Task | None = None
     try:
         cleanup_task = asyncio.create_task(periodic_cleanup(config.data_path, max_age_days=max_age_days), name='kernel_cleanup')
+        typing_task = asyncio.create_task(typing_loop(state), name='kernel_typing')
         log.info('Bot ready — polling …')
 
         stop_event = asyncio.Event()
@@ -125,17 +127,25 @@ async def run_bot() -> None:
                 await cleanup_task
             except asyncio.CancelledError:
                 pass
+        if typing_task:
+            typing_task.cancel()
+            try:
+                await typing_task
+            except asyncio.CancelledError:
+                pass
         try:
             if stt_client:
                 await stt_client.close()
         except BaseException:
             pass
+        # The agent's close flushes queued messages into the store, so it
+        # must run before the store is closed.
         try:
-            await store.close()
+            await agent.close()
         except BaseException:
             pass
         try:
-            await agent.close()
+            await store.close()
         except BaseException:
             pass
         try:
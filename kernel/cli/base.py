@@ -4,16 +4,21 @@ import logging
 import os
 import shutil
 import subprocess
+import secrets
 import sys
-import uuid
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 log = logging.getLogger(__name__)
 CLI_TIMEOUT = 600
 OUTPUT_TRUNCATE_CHARS = 50000
 
+def _utc_stamp() -> str:
+    # Fixed format assembled directly from gmtime; cheaper than strftime.
+    t = time.gmtime()
+    return f'{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}'
+
 def _truncate_output(text: str, max_chars: int=OUTPUT_TRUNCATE_CHARS) -> str:
     if len(text) <= max_chars:
         return text
@@ -44,8 +49,8 @@ class CLIAgent(ABC):
         self._process: asyncio.subprocess.Process | None = None
 
     def _make_output_path(self) -> Path:
-        ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        uid = uuid.uuid4().hex[:6]
+        ts = _utc_stamp()
+        uid = secrets.token_hex(3)
         return self.output_dir / f'{self.name}_{ts}_{uid}.txt'
 
     @abstractmethod
@@ -74,6 +74,7 @@ def load_config(path: str | Path | None = None) -> Config:
         context_rounds=g.get("context_rounds", 50),
         memory_recall_k=g.get("memory_recall_k", 5),
         data_dir=g.get("data_dir", "data"),
+        fast_ack=g.get("fast_ack", False),
     )
 
     providers: dict[str, ProviderConfig] = {}
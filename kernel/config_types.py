@@ -15,6 +15,7 @@ class GeneralConfig:
     context_rounds: int = 50
     memory_recall_k: int = 5
     data_dir: str = "data"
+    fast_ack: bool = False
 
 @dataclass
 class ProviderConfig:
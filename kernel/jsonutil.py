@@ -0,0 +1,24 @@
+from __future__ import annotations
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback for envs without orjson
+    orjson = None
+
+if orjson is not None:
+
+    def json_loads(s: str | bytes) -> Any:
+        return orjson.loads(s)
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+
+    def json_loads(s: str | bytes) -> Any:
+        return json.loads(s)
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
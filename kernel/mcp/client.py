@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 import hashlib
 import logging
 import re
@@ -13,6 +14,7 @@ from kernel.models.base import ToolDef
 log = logging.getLogger(__name__)
 _INVALID_TOOL_CHAR_RE = re.compile('[^A-Za-z0-9_-]')
 _MAX_TOOL_NAME_LEN = 64
+_MAX_CONNECT_CONCURRENCY = 8
 
 def _safe_tool_name(server_name: str, tool_name: str) -> str:
     raw = f'mcp_{server_name}__{tool_name}'
@@ -127,12 +129,17 @@ class MCPClient:
         self._tool_map: dict[str, tuple[str, str]] = {}
 
     async def connect_all(self) -> None:
+        sem = asyncio.Semaphore(_MAX_CONNECT_CONCURRENCY)
+
+        async def _connect(conn: _ServerConnection) -> None:
+            async with sem:
+                ok = await conn.connect()
+                if not ok:
+                    log.warning('MCP [%s] skipped — connection failed', conn.name)
+
         for cfg in self._configs:
-            conn = _ServerConnection(cfg)
-            self._connections[cfg.name] = conn
-            ok = await conn.connect()
-            if not ok:
-                log.warning('MCP [%s] skipped — connection failed', cfg.name)
+            self._connections[cfg.name] = _ServerConnection(cfg)
+        await asyncio.gather(*(_connect(c) for c in self._connections.values()))
 
     def get_tool_defs(self) -> dict[str, ToolDef]:
         self._tool_map.clear()
@@ -75,13 +75,20 @@ async def check_fts5_exists(db: aiosqlite.Connection) -> bool:
         return False
 
 async def memory_add(db: aiosqlite.Connection, text: str, *, fts5_available: bool) -> int:
+    ids = await memory_add_many(db, [text], fts5_available=fts5_available)
+    return ids[0]
+
+async def memory_add_many(db: aiosqlite.Connection, texts: list[str], *, fts5_available: bool) -> list[int]:
     now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-    cur = await db.execute('INSERT INTO memories (text, created_at) VALUES (?, ?)', (text, now))
-    mid = cur.lastrowid
-    if fts5_available:
-        await db.execute('INSERT INTO memories_fts(rowid, text) VALUES (?, ?)', (mid, _tokenize(text)))
+    ids: list[int] = []
+    for text in texts:
+        cur = await db.execute('INSERT INTO memories (text, created_at) VALUES (?, ?)', (text, now))
+        mid = cur.lastrowid
+        ids.append(mid)
+        if fts5_available:
+            await db.execute('INSERT INTO memories_fts(rowid, text) VALUES (?, ?)', (mid, _tokenize(text)))
     await db.commit()
-    return mid
+    return ids
 
 async def memory_search(db: aiosqlite.Connection, query: str, *, limit: int = 5, fts5_available: bool) -> list[dict[str, Any]]:
     if fts5_available:
@@ -2,15 +2,16 @@ from __future__ import annotations
 from pathlib import Path
 import aiosqlite
 
-SCHEMA_VERSION = 4
+SCHEMA_VERSION = 5
 
-DDL = "CREATE TABLE IF NOT EXISTS sessions (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    title       TEXT,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),\n    updated_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),\n    archived    INTEGER NOT NULL DEFAULT 0\n);\n\nCREATE TABLE IF NOT EXISTS messages (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    session_id  INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,\n    role        TEXT NOT NULL,\n    content     TEXT NOT NULL,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))\n);\nCREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);\n\nCREATE TABLE IF NOT EXISTS settings (\n    key   TEXT PRIMARY KEY,\n    value TEXT NOT NULL\n);\n\nCREATE TABLE IF NOT EXISTS memories (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    text        TEXT NOT NULL,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))\n);\n"
+DDL = "CREATE TABLE IF NOT EXISTS sessions (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    title       TEXT,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),\n    updated_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),\n    archived    INTEGER NOT NULL DEFAULT 0\n);\n\nCREATE TABLE IF NOT EXISTS messages (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    session_id  INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,\n    role        TEXT NOT NULL,\n    content     TEXT NOT NULL,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))\n);\nCREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);\n\nCREATE TABLE IF NOT EXISTS settings (\n    key   TEXT PRIMARY KEY,\n    value TEXT NOT NULL\n);\n\nCREATE TABLE IF NOT EXISTS memories (\n    id          INTEGER PRIMARY KEY AUTOINCREMENT,\n    text        TEXT NOT NULL,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))\n);\n\nCREATE TABLE IF NOT EXISTS title_cache (\n    key         TEXT PRIMARY KEY,\n    title       TEXT NOT NULL,\n    created_at  TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))\n);\n"
 
 _REQUIRED_COLUMNS: dict[str, set[str]] = {
     "sessions": {"id", "title", "created_at", "updated_at", "archived"},
     "messages": {"id", "session_id", "role", "content", "created_at"},
     "settings": {"key", "value"},
     "memories": {"id", "text", "created_at"},
+    "title_cache": {"key", "title", "created_at"},
 }
 
 _ADD_COLUMN_DDL: dict[tuple[str, str], str] = {
@@ -1,6 +1,6 @@
 from __future__ import annotations
-import json
 from typing import Any
+from kernel.jsonutil import json_loads
 
 _SLIM_THRESHOLD = 200
 
@@ -38,16 +38,16 @@ def slim_content(_role: str, content: Any) -> Any:
 
 def _should_slim_tool_result(raw: str) -> bool:
     try:
-        data = json.loads(raw)
+        data = json_loads(raw)
         if isinstance(data, dict) and data.get('output_path'):
             return True
-    except (json.JSONDecodeError, TypeError):
+    except (ValueError, TypeError):
         pass
     return len(raw) > _SLIM_THRESHOLD
 
 def _summarise_tool_result(raw: str) -> str:
     try:
-        data = json.loads(raw)
+        data = json_loads(raw)
         if isinstance(data, dict):
             ok = data.get('ok')
             cli = data.get('cli', '')
@@ -58,7 +58,7 @@ def _summarise_tool_result(raw: str) -> str:
                 return f'[{cli} 任务{status}，详见 {output_path}]'
             keys = ', '.join(list(data.keys())[:5])
             return f'[工具结果: {{{keys}...}}，{len(raw)} 字符已省略]'
-    except (json.JSONDecodeError, TypeError):
+    except (ValueError, TypeError):
         pass
     preview = raw[:80].replace('\n', ' ')
     return f'[工具结果: {preview}… ({len(raw)} 字符已省略)]'
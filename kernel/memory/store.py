@@ -1,13 +1,14 @@
 from __future__ import annotations
-import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 import aiosqlite
+from kernel.jsonutil import json_dumps, json_loads
 from kernel.memory.memories import (
     check_fts5_exists as _check_fts5_exists,
     memory_add as _memory_add,
+    memory_add_many as _memory_add_many,
     memory_delete as _memory_delete,
     memory_list as _memory_list,
     memory_search as _memory_search,
@@ -158,7 +159,7 @@ class Store:
 
     async def add_message(self, session_id: int, role: str, content: Any) -> int:
         assert self._db
-        content_json = json.dumps(content, ensure_ascii=False)
+        content_json = json_dumps(content)
         now = _now_iso()
         cur = await self._db.execute(
             'INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)',
@@ -170,6 +171,26 @@ class Store:
         await self._db.commit()
         return cur.lastrowid
 
+    async def add_messages_batch(self, rows: list[tuple[int, str, Any]]) -> None:
+        assert self._db
+        if not rows:
+            return
+        now = _now_iso()
+        params = [
+            (session_id, role, json_dumps(content), now)
+            for session_id, role, content in rows
+        ]
+        await self._db.executemany(
+            'INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)',
+            params,
+        )
+        session_ids = {session_id for session_id, _, _ in rows}
+        await self._db.executemany(
+            'UPDATE sessions SET updated_at = ? WHERE id = ?',
+            [(now, session_id) for session_id in session_ids],
+        )
+        await self._db.commit()
+
     async def get_messages(self, session_id: int, *, limit: int | None = None) -> list[dict[str, Any]]:
         assert self._db
         sql = 'SELECT id, session_id, role, content, created_at FROM messages WHERE session_id = ? ORDER BY id ASC'
@@ -184,7 +205,7 @@ class Store:
         result = []
         for r in rows:
             d = dict(r)
-            d['content'] = json.loads(d['content'])
+            d['content'] = json_loads(d['content'])
             result.append(d)
         return result
 
@@ -194,10 +215,28 @@ class Store:
         row = await cur.fetchone()
         return row[0] if row else 0
 
+    async def title_cache_get(self, key: str) -> str | None:
+        assert self._db
+        cur = await self._db.execute('SELECT title FROM title_cache WHERE key = ?', (key,))
+        row = await cur.fetchone()
+        return row[0] if row else None
+
+    async def title_cache_set(self, key: str, title: str) -> None:
+        assert self._db
+        await self._db.execute(
+            'INSERT INTO title_cache (key, title, created_at) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET title = excluded.title',
+            (key, title, _now_iso()),
+        )
+        await self._db.commit()
+
     async def memory_add(self, text: str) -> int:
         assert self._db
         return await _memory_add(self._db, text, fts5_available=self.fts5_available)
 
+    async def memory_add_many(self, texts: list[str]) -> list[int]:
+        assert self._db
+        return await _memory_add_many(self._db, texts, fts5_available=self.fts5_available)
+
     async def memory_search(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
         assert self._db
         return await _memory_search(self._db, query, limit=limit, fts5_available=self.fts5_available)
@@ -9,25 +9,25 @@ class Role(str, Enum):
     ASSISTANT = 'assistant'
     TOOL_RESULT = 'tool_result'
 
-@dataclass
+@dataclass(slots=True)
 class TextContent:
     text: str
     type: str = 'text'
 
-@dataclass
+@dataclass(slots=True)
 class ImageContent:
     media_type: str
     data: str
     type: str = 'image'
 
-@dataclass
+@dataclass(slots=True)
 class ToolUseContent:
     id: str
     name: str
     input: dict[str, Any]
     type: str = 'tool_use'
 
-@dataclass
+@dataclass(slots=True)
 class ToolResultContent:
     tool_use_id: str
     content: str
@@ -35,7 +35,7 @@ class ToolResultContent:
     type: str = 'tool_result'
 ContentBlock = TextContent | ImageContent | ToolUseContent | ToolResultContent
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     role: Role
     content: list[ContentBlock] | str
@@ -43,19 +43,15 @@ class Message:
     def text_content(self) -> str:
         if isinstance(self.content, str):
             return self.content
-        parts = []
-        for block in self.content:
-            if isinstance(block, TextContent):
-                parts.append(block.text)
-        return '\n'.join(parts)
+        return '\n'.join([b.text for b in self.content if type(b) is TextContent])
 
-@dataclass
+@dataclass(slots=True)
 class ToolDef:
     name: str
     description: str
     parameters: dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class StreamChunk:
     text: str = ''
     tool_use_id: str | None = None
@@ -63,7 +59,7 @@ class StreamChunk:
     tool_input_json: str = ''
     finish_reason: str | None = None
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     content: list[ContentBlock] = field(default_factory=list)
     stop_reason: str | None = None
@@ -79,11 +75,11 @@ class LLMResponse:
 class LLM(ABC):
 
     @abstractmethod
-    async def chat(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
+    async def chat(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
         ...
 
     @abstractmethod
-    async def chat_stream(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
+    async def chat_stream(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
         ...
 
     @abstractmethod
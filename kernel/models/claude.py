@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Any, AsyncIterator
 import anthropic
+import httpx
 from kernel.models.base import ContentBlock, ImageContent, LLM, LLMResponse, Message, Role, StreamChunk, TextContent, ToolDef, ToolResultContent, ToolUseContent
 
 def _to_anthropic_content(blocks: list[ContentBlock] | str) -> list[dict[str, Any]] | str:
@@ -26,6 +27,16 @@ def _to_anthropic_messages(messages: list[Message]) -> list[dict[str, Any]]:
         out.append({'role': role, 'content': content})
     return out
 
+def _to_anthropic_system(system: str | None, suffix: str | None=None) -> list[dict[str, Any]]:
+    # The stable prefix carries cache_control; per-turn material (e.g. the
+    # current time) goes in a trailing block so the cache still hits.
+    blocks: list[dict[str, Any]] = []
+    if system:
+        blocks.append({'type': 'text', 'text': system, 'cache_control': {'type': 'ephemeral'}})
+    if suffix:
+        blocks.append({'type': 'text', 'text': suffix})
+    return blocks
+
 def _to_anthropic_tools(tools: list[ToolDef]) -> list[dict[str, Any]]:
     return [{'name': t.name, 'description': t.description, 'input_schema': t.parameters} for t in tools]
 
@@ -41,29 +52,31 @@ def _from_anthropic_content(blocks: list[dict[str, Any]]) -> list[ContentBlock]:
 
 class ClaudeLLM(LLM):
 
-    def __init__(self, api_key: str, default_model: str, max_tokens: int, *, api_base: str | None=None, headers: dict[str, str] | None=None) -> None:
+    def __init__(self, api_key: str, default_model: str, max_tokens: int, *, api_base: str | None=None, headers: dict[str, str] | None=None, http_client: httpx.AsyncClient | None=None) -> None:
         kwargs: dict[str, Any] = {'api_key': api_key}
         if api_base:
             kwargs['base_url'] = api_base
         if headers:
             kwargs['default_headers'] = headers
+        if http_client is not None:
+            kwargs['http_client'] = http_client
         self._client = anthropic.AsyncAnthropic(**kwargs)
         self._default_model = default_model
         self._max_tokens = max_tokens
 
-    async def chat(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
+    async def chat(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
         kwargs: dict[str, Any] = {'model': model or self._default_model, 'max_tokens': self._max_tokens, 'messages': _to_anthropic_messages(messages)}
-        if system:
-            kwargs['system'] = system
+        if system or system_suffix:
+            kwargs['system'] = _to_anthropic_system(system, system_suffix)
         if tools:
             kwargs['tools'] = _to_anthropic_tools(tools)
         resp = await self._client.messages.create(**kwargs)
         return LLMResponse(content=_from_anthropic_content([b.model_dump() for b in resp.content]), stop_reason=resp.stop_reason, usage={'input_tokens': resp.usage.input_tokens, 'output_tokens': resp.usage.output_tokens})
 
-    async def chat_stream(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
+    async def chat_stream(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
         kwargs: dict[str, Any] = {'model': model or self._default_model, 'max_tokens': self._max_tokens, 'messages': _to_anthropic_messages(messages)}
-        if system:
-            kwargs['system'] = system
+        if system or system_suffix:
+            kwargs['system'] = _to_anthropic_system(system, system_suffix)
         if tools:
             kwargs['tools'] = _to_anthropic_tools(tools)
         async with self._client.messages.stream(**kwargs) as stream:
@@ -1,8 +1,9 @@
 from __future__ import annotations
-import json
 import logging
 from typing import Any, AsyncIterator
+import httpx
 import openai
+from kernel.jsonutil import json_dumps, json_loads
 from kernel.models.base import ContentBlock, ImageContent, LLM, LLMResponse, Message, Role, StreamChunk, TextContent, ToolDef, ToolResultContent, ToolUseContent
 
 log = logging.getLogger(__name__)
@@ -21,10 +22,13 @@ def _to_openai_content(blocks: list[ContentBlock] | str) -> str | list[dict[str,
             out.append({'type': 'image_url', 'image_url': {'url': f'data:{b.media_type};base64,{b.data}'}})
     return out
 
-def _to_openai_messages(messages: list[Message], *, system: str | None=None) -> list[dict[str, Any]]:
+def _to_openai_messages(messages: list[Message], *, system: str | None=None, system_suffix: str | None=None) -> list[dict[str, Any]]:
     out: list[dict[str, Any]] = []
-    if system:
-        out.append({'role': 'system', 'content': system})
+    # Per-turn material goes after the stable prefix so automatic prompt
+    # caching on the provider side still matches the leading tokens.
+    sys_text = '\n\n'.join((p for p in (system, system_suffix) if p))
+    if sys_text:
+        out.append({'role': 'system', 'content': sys_text})
     for msg in messages:
         if msg.role == Role.USER:
             out.append({'role': 'user', 'content': _to_openai_content(msg.content)})
@@ -38,7 +42,7 @@ def _to_openai_messages(messages: list[Message], *, system: str | None=None) ->
                 tool_uses = [b for b in msg.content if isinstance(b, ToolUseContent)]
                 entry['content'] = '\n'.join(text_parts) if text_parts else None
                 if tool_uses:
-                    entry['tool_calls'] = [{'id': tu.id, 'type': 'function', 'function': {'name': tu.name, 'arguments': json.dumps(tu.input)}} for tu in tool_uses]
+                    entry['tool_calls'] = [{'id': tu.id, 'type': 'function', 'function': {'name': tu.name, 'arguments': json_dumps(tu.input)}} for tu in tool_uses]
             out.append(entry)
             continue
         if msg.role == Role.TOOL_RESULT:
@@ -55,18 +59,20 @@ def _to_openai_tools(tools: list[ToolDef]) -> list[dict[str, Any]]:
 
 class OpenAICompatLLM(LLM):
 
-    def __init__(self, api_key: str, default_model: str, *, api_base: str | None=None, max_tokens: int | None=None, headers: dict[str, str] | None=None) -> None:
+    def __init__(self, api_key: str, default_model: str, *, api_base: str | None=None, max_tokens: int | None=None, headers: dict[str, str] | None=None, http_client: httpx.AsyncClient | None=None) -> None:
         kwargs: dict[str, Any] = {'api_key': api_key}
         if api_base:
             kwargs['base_url'] = api_base
         if headers:
             kwargs['default_headers'] = headers
+        if http_client is not None:
+            kwargs['http_client'] = http_client
         self._client = openai.AsyncOpenAI(**kwargs)
         self._default_model = default_model
         self._max_tokens = max_tokens
 
-    async def chat(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
-        kwargs: dict[str, Any] = {'model': model or self._default_model, 'messages': _to_openai_messages(messages, system=system)}
+    async def chat(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> LLMResponse:
+        kwargs: dict[str, Any] = {'model': model or self._default_model, 'messages': _to_openai_messages(messages, system=system, system_suffix=system_suffix)}
         if self._max_tokens is not None:
             kwargs['max_tokens'] = self._max_tokens
         if tools:
@@ -80,14 +86,14 @@ class OpenAICompatLLM(LLM):
         if msg.tool_calls:
             for tc in msg.tool_calls:
                 try:
-                    args = json.loads(tc.function.arguments) if tc.function.arguments else {}
+                    args = json_loads(tc.function.arguments) if tc.function.arguments else {}
                 except Exception:
                     args = {}
                 content.append(ToolUseContent(id=tc.id, name=tc.function.name, input=args))
         return LLMResponse(content=content, stop_reason=choice.finish_reason, usage={'input_tokens': resp.usage.prompt_tokens if resp.usage else 0, 'output_tokens': resp.usage.completion_tokens if resp.usage else 0})
 
-    async def chat_stream(self, messages: list[Message], *, system: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
-        kwargs: dict[str, Any] = {'model': model or self._default_model, 'messages': _to_openai_messages(messages, system=system), 'stream': True}
+    async def chat_stream(self, messages: list[Message], *, system: str | None=None, system_suffix: str | None=None, tools: list[ToolDef] | None=None, model: str | None=None) -> AsyncIterator[StreamChunk]:
+        kwargs: dict[str, Any] = {'model': model or self._default_model, 'messages': _to_openai_messages(messages, system=system, system_suffix=system_suffix), 'stream': True}
         if self._max_tokens is not None:
             kwargs['max_tokens'] = self._max_tokens
         if tools:
@@ -1,23 +1,24 @@
 from __future__ import annotations
 import html
-from typing import Any
+import time
 from telegram import Update
 from telegram.ext import ContextTypes
 from kernel.tg_common import BotState, _check_user, _mask_sensitive, _require_idle, _send_text
 
-_history_map: dict[int, int] = {}
+_SESSIONS_CACHE_TTL = 2.0
 
-def _build_history_map(sessions: list[dict[str, Any]]) -> dict[int, int]:
-    global _history_map
-    _history_map = {i + 1: s['id'] for i, s in enumerate(sessions)}
-    return _history_map
-
-def _resolve_session_num(num_str: str) -> int | None:
+def _resolve_session_num(state: BotState, num_str: str) -> int | None:
+    # The map carries both '#n' and 'n' keys, so the common case is a
+    # single lookup; odd spellings like '##3' fall back to a parse.
+    s = num_str.strip()
+    sid = state._history_map.get(s)
+    if sid is not None:
+        return sid
     try:
-        n = int(num_str.lstrip('#'))
+        n = int(s.lstrip('#'))
     except ValueError:
         return None
-    return _history_map.get(n)
+    return state._history_map.get(str(n))
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     state: BotState = context.bot_data['state']
@@ -38,20 +39,31 @@ async def cmd_new(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not await _require_idle(update, state):
         return
     sid = await state.agent.new_session()
+    state._sessions_cache = None
     await _send_text(update, f'新会话已创建 (#{sid})')
 
 async def cmd_history(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     state: BotState = context.bot_data['state']
     if not _check_user(update, state):
         return
-    sessions = await state.store.list_sessions(limit=20)
+    cached = state._sessions_cache
+    if cached and time.monotonic() - cached[0] < _SESSIONS_CACHE_TTL:
+        sessions = cached[1]
+    else:
+        sessions = await state.store.list_sessions(limit=20)
+        state._sessions_cache = (time.monotonic(), sessions)
     if not sessions:
         await _send_text(update, '暂无历史会话。')
         return
-    hmap = _build_history_map(sessions)
+    hmap: dict[str, int] = {}
+    for i, s in enumerate(sessions):
+        hmap[f'#{i + 1}'] = hmap[str(i + 1)] = s['id']
+    state._history_map = hmap
     lines: list[str] = []
-    for n, sid in sorted(hmap.items()):
-        s = next((s for s in sessions if s['id'] == sid))
+    # The map is positional over sessions, so walk them directly instead
+    # of scanning the list per entry.
+    for n, s in enumerate(sessions, 1):
+        sid = s['id']
         title = html.escape(s['title'] or '无标题')
         date = state.format_dt(s['updated_at'])
         current = ' ← 当前' if sid == state.agent.session_id else ''
@@ -68,7 +80,7 @@ async def cmd_resume(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     if not args:
         await _send_text(update, '用法：/resume #n\n先用 /history 查看序号。', parse_mode=None)
         return
-    sid = _resolve_session_num(args[0])
+    sid = _resolve_session_num(state, args[0])
     if sid is None:
         await _send_text(update, f'无效序号：{args[0]}。先用 /history 查看。', parse_mode=None)
         return
@@ -89,7 +101,7 @@ async def cmd_retitle(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
     args = context.args
     if args:
-        sid = _resolve_session_num(args[0])
+        sid = _resolve_session_num(state, args[0])
         if sid is None:
             await _send_text(update, f'无效序号：{args[0]}。', parse_mode=None)
             return
@@ -100,6 +112,7 @@ async def cmd_retitle(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             return
     try:
         title = await state.agent.regenerate_title(sid)
+        state._sessions_cache = None
         if title:
             await _send_text(update, f'新标题：{title}', parse_mode=None)
         else:
@@ -120,13 +133,15 @@ async def cmd_del_history(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     sids: list[int] = []
     for a in args:
         for part in a.split('/'):
-            sid = _resolve_session_num(part.strip())
+            sid = _resolve_session_num(state, part.strip())
             if sid is None:
                 await _send_text(update, f'无效序号：{part}。先用 /history 查看。', parse_mode=None)
                 return
             sids.append(sid)
     deleted = await state.store.delete_sessions(sids)
+    state._sessions_cache = None
     if state.agent.session_id in sids:
         state.agent._session_id = None
-        state.agent._history = []
+        state.agent._history = state.agent._new_history()
+        state.agent._turn_json.clear()
     await _send_text(update, f'已删除 {deleted} 个会话。', parse_mode=None)
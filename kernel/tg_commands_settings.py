@@ -12,12 +12,11 @@ async def cmd_provider(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     args = context.args
     if not args:
         current = state.agent.current_provider_name
-        available = state.agent.available_providers
-        lines = [f'当前 provider：<b>{current}</b>', '']
-        for p in available:
-            marker = ' ← 当前' if p == current else ''
-            lines.append(f'  • {p}{marker}')
-        await _send_text(update, '\n'.join(lines))
+        body = '\n'.join(
+            f"  • {p}{' ← 当前' if p == current else ''}"
+            for p in state.agent.available_providers
+        )
+        await _send_text(update, f'当前 provider：<b>{current}</b>\n\n{body}')
         return
     try:
         name = state.agent.switch_provider(args[0])
@@ -36,11 +35,13 @@ async def cmd_model(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not args:
         prov = state.config.providers[state.agent.current_provider_name]
         current = state.agent.current_model
-        lines = [f'当前模型：<b>{current}</b>', f'Provider：{state.agent.current_provider_name}', '']
-        for m in prov.models:
-            marker = ' ← 当前' if m == current else ''
-            lines.append(f'  • {m}{marker}')
-        await _send_text(update, '\n'.join(lines))
+        body = '\n'.join(
+            f"  • {m}{' ← 当前' if m == current else ''}" for m in prov.models
+        )
+        await _send_text(
+            update,
+            f'当前模型：<b>{current}</b>\nProvider：{state.agent.current_provider_name}\n\n{body}',
+        )
         return
     try:
         model = state.agent.switch_model(args[0])
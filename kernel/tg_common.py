@@ -17,16 +17,27 @@ if TYPE_CHECKING:
     from kernel.voice.stt import STTClient
     from kernel.voice.tts import TTSClient
 
-_SENSITIVE_PATTERNS = [
-    (re.compile(r'(sk-ant-[A-Za-z0-9]{4})[A-Za-z0-9-]+([A-Za-z0-9]{4})'), r'\1…\2'),
-    (re.compile(r'(sk-[A-Za-z0-9]{4})[A-Za-z0-9-]+([A-Za-z0-9]{4})'), r'\1…\2'),
-    (re.compile(r'(\d{8,12}):[A-Za-z0-9_-]{30,}'), '[TG_TOKEN_REDACTED]'),
-]
+# Single alternation so each message is scanned once instead of once per
+# pattern. The sk-ant branch must come before sk- so full Anthropic keys
+# keep their prefix.
+_SENSITIVE_RE = re.compile(
+    r'(?P<ant>sk-ant-[A-Za-z0-9]{4})[A-Za-z0-9-]+(?P<ant2>[A-Za-z0-9]{4})'
+    r'|(?P<sk>sk-[A-Za-z0-9]{4})[A-Za-z0-9-]+(?P<sk2>[A-Za-z0-9]{4})'
+    # (?<!\d) keeps the token branch from re-attempting at every offset
+    # inside a long digit run, which made masking big tracebacks O(n·k).
+    r'|(?<!\d)\d{8,12}:[A-Za-z0-9_-]{30,}'
+)
+
+def _mask_sub(m: re.Match[str]) -> str:
+    last = m.lastgroup
+    if last == 'ant2':
+        return f'{m["ant"]}…{m["ant2"]}'
+    if last == 'sk2':
+        return f'{m["sk"]}…{m["sk2"]}'
+    return '[TG_TOKEN_REDACTED]'
 
 def _mask_sensitive(text: str) -> str:
-    for pattern, repl in _SENSITIVE_PATTERNS:
-        text = pattern.sub(repl, text)
-    return text
+    return _SENSITIVE_RE.sub(_mask_sub, text)
 
 class MaskingFormatter(logging.Formatter):
 
@@ -57,20 +68,44 @@ class BotState:
         self.config = config
         self.agent = agent
         self.store = store
-        self.busy = False
         self.busy_notified = False
         self._chat_task: asyncio.Task | None = None
-        self._chat_gate: asyncio.Queue[None] = asyncio.Queue(maxsize=1)
-        self._chat_gate.put_nowait(None)
+        self._chat_lock = asyncio.Lock()
+        self._typing_event = asyncio.Event()
+        self._typing_update: Update | None = None
+        # /history numbering and a short-lived session-list cache; owned
+        # by the state object rather than a module global. Keyed by the
+        # literal token ('#3' and '3') so resolution is one dict.get.
+        self._history_map: dict[str, int] = {}
+        self._sessions_cache: tuple[float, list[dict]] | None = None
         self._tz = ZoneInfo(config.general.timezone)
+        # Current UTC offset in seconds, for the format_dt fast path.
+        # Captured once at startup; the fast path keeps an hour of margin
+        # around midnight so a later DST shift can't flip a date.
+        self._tz_offset = int(datetime.now(self._tz).utcoffset().total_seconds())
         self.stt: STTClient | None = None
         self.tts: TTSClient | None = None
         self._last_message_was_voice = False
 
+    @property
+    def busy(self) -> bool:
+        return self._chat_lock.locked()
+
     def local_now(self) -> datetime:
         return datetime.now(self._tz)
 
     def format_dt(self, iso: str) -> str:
+        # Rows store UTC as 'YYYY-MM-DDTHH:MM:SSZ'. Unless applying the
+        # configured zone's offset moves the time of day across midnight
+        # (checked with an hour of margin in case the offset has drifted
+        # since startup), the local date is just the first 10 chars.
+        if len(iso) >= 19 and iso.endswith('Z'):
+            try:
+                shifted = int(iso[11:13]) * 3600 + int(iso[14:16]) * 60 + self._tz_offset
+            except ValueError:
+                shifted = -1
+            if 3600 <= shifted < 82800:
+                return iso[:10]
         try:
             dt = datetime.fromisoformat(iso).astimezone(self._tz)
             return dt.strftime('%Y-%m-%d')
@@ -91,16 +126,17 @@ async def _require_idle(update: Update, state: BotState) -> bool:
 
 async def _send_text(update: Update, text: str, *, parse_mode: str | None = ParseMode.HTML) -> None:
     chat_id = update.effective_chat.id
+    bot = update.get_bot()
     if parse_mode == ParseMode.HTML:
         chunks = split_tg_message(text)
     else:
         chunks = split_plain_text(text)
     for chunk in chunks:
         try:
-            await update.get_bot().send_message(chat_id=chat_id, text=chunk, parse_mode=parse_mode, disable_web_page_preview=True)
+            await bot.send_message(chat_id=chat_id, text=chunk, parse_mode=parse_mode, disable_web_page_preview=True)
         except Exception as exc:
             if parse_mode == ParseMode.HTML and "can't parse entities" in str(exc).lower():
-                await update.get_bot().send_message(chat_id=chat_id, text=chunk, parse_mode=None)
+                await bot.send_message(chat_id=chat_id, text=chunk, parse_mode=None)
             else:
                 raise
 
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import asyncio
 import base64
+import io
 import logging
 from io import BytesIO
 from pathlib import Path
@@ -8,28 +9,42 @@ from typing import Any
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
+from kernel.models.base import ImageContent, TextContent
 from kernel.render import md_to_tg_html
 from kernel.tg_common import BotState, _check_user, _mask_sensitive, _sanitize_filename, _send_text, _send_typing
 from kernel.tg_message_utils import _MAX_FILE_SIZE, _extract_file_text, _is_text_file, _to_tts_text, _wrap_file_text
 
 log = logging.getLogger(__name__)
 
+async def typing_loop(state: BotState) -> None:
+    # One long-lived heartbeat task shared by all messages, instead of a
+    # task spawned and cancelled per message. Sleeps first so the initial
+    # typing action sent by handle_message isn't duplicated.
+    while True:
+        await state._typing_event.wait()
+        await asyncio.sleep(4)
+        update = state._typing_update
+        if state._typing_event.is_set() and update is not None:
+            try:
+                await _send_typing(update)
+            except Exception:
+                log.debug('Typing heartbeat failed', exc_info=True)
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     state: BotState = context.bot_data['state']
     if not _check_user(update, state):
         return
-    try:
-        state._chat_gate.get_nowait()
-    except asyncio.QueueEmpty:
+    if state._chat_lock.locked():
         if not state.busy_notified:
             state.busy_notified = True
             await _send_text(update, '正在处理上一条消息，请稍后或 /cancel', parse_mode=None)
         return
-    state.busy = True
+    # No await between the locked() check and acquire(), so the pair is
+    # atomic on the event loop even with concurrent_updates enabled.
+    await state._chat_lock.acquire()
     state.busy_notified = False
     state._chat_task = asyncio.current_task()
     try:
-        from kernel.models.base import ImageContent, TextContent
         content_blocks: list[Any] = []
         msg = update.message
         if msg and msg.voice:
@@ -61,14 +76,24 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             content_blocks.append(TextContent(text=f'[语音: {text}]'))
         elif msg and msg.photo:
             photo = msg.photo[-1]
+            # Reject oversize images before paying for the download; the
+            # post-download check stays as a fallback when file_size is absent.
+            if photo.file_size and photo.file_size > _MAX_FILE_SIZE:
+                await _send_text(update, '图片超过 20MB，无法处理。', parse_mode=None)
+                return
             file = await photo.get_file()
             buf = BytesIO()
             await file.download_to_memory(buf)
-            img_bytes = buf.getvalue()
-            if len(img_bytes) > _MAX_FILE_SIZE:
+            # getbuffer() views the BytesIO storage in place; getvalue()
+            # would copy the whole image just to encode it.
+            mv = buf.getbuffer()
+            if len(mv) > _MAX_FILE_SIZE:
+                mv.release()
                 await _send_text(update, '图片超过 20MB，无法处理。', parse_mode=None)
                 return
-            b64 = base64.b64encode(img_bytes).decode('ascii')
+            b64 = base64.b64encode(mv).decode('ascii')
+            mv.release()
+            del buf
             content_blocks.append(ImageContent(media_type='image/jpeg', data=b64))
             if msg.caption:
                 content_blocks.append(TextContent(text=msg.caption))
@@ -116,22 +141,15 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return
         user_content = content_blocks
         await _send_typing(update)
-        text_parts: list[str] = []
-        typing_task: asyncio.Task | None = None
-
-        async def _keep_typing() -> None:
-            try:
-                while True:
-                    await asyncio.sleep(4)
-                    await _send_typing(update)
-            except asyncio.CancelledError:
-                pass
-
-        typing_task = asyncio.create_task(_keep_typing())
+        # StringIO grows one internal buffer instead of holding every
+        # streamed fragment as its own list entry until the final join.
+        text_buf = io.StringIO()
+        state._typing_update = update
+        state._typing_event.set()
         try:
             async for chunk in state.agent.chat(user_content):
                 if chunk.text:
-                    text_parts.append(chunk.text)
+                    text_buf.write(chunk.text)
                 elif chunk.tool_name:
                     tool = chunk.tool_name
                     if tool == 'delegate_to_cli':
@@ -144,17 +162,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await _send_text(update, f'Error: {error_msg}', parse_mode=None)
             return
         finally:
-            if typing_task:
-                typing_task.cancel()
-                try:
-                    await typing_task
-                except asyncio.CancelledError:
-                    pass
+            state._typing_event.clear()
+            state._typing_update = None
 
-        full_text = ''.join(text_parts)
+        full_text = text_buf.getvalue()
         if not full_text.strip():
             return
-        await state.agent.maybe_generate_title()
+        # Title generation (including its session lookup) can run while the
+        # reply is being rendered and sent; _spawn keeps a strong reference
+        # and logs failures.
+        state.agent._spawn(state.agent.maybe_generate_title())
 
         if state._last_message_was_voice and state.tts:
             voice_path: Path | None = None
@@ -184,5 +201,4 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     finally:
         state._chat_task = None
         state._last_message_was_voice = False
-        state.busy = False
-        state._chat_gate.put_nowait(None)
+        state._chat_lock.release()